@@ -1,15 +1,28 @@
 # Basic arcade shooter
 
+from collections import deque
 from enum import Enum
-from time import sleep
-from typing import List
+from time import monotonic
+from typing import Callable, Deque, Dict, List
 import arcade
+import pyglet
 import random
 
 SCREEN_WIDTH: int = 800
 SCREEN_HEIGHT: int = 600
 SCREEN_TITLE: str = "Arcade Space Shooter"
 SCALING: float = 1.5
+# Off-screen flyers kept around for reuse by the spawners
+ENEMY_POOL_SIZE: int = 32
+CLOUD_POOL_SIZE: int = 8
+
+# Movement keys, as sets for hashed membership tests
+UP_KEYS: frozenset = frozenset((arcade.key.W, arcade.key.UP))
+DOWN_KEYS: frozenset = frozenset((arcade.key.S, arcade.key.DOWN))
+LEFT_KEYS: frozenset = frozenset((arcade.key.A, arcade.key.LEFT))
+RIGHT_KEYS: frozenset = frozenset((arcade.key.D, arcade.key.RIGHT))
+VERTICAL_KEYS: frozenset = UP_KEYS | DOWN_KEYS
+HORIZONTAL_KEYS: frozenset = LEFT_KEYS | RIGHT_KEYS
 
 
 class SpritesEnum(str, Enum):
@@ -23,15 +36,27 @@ class FlyingSprite(arcade.Sprite):
     Flying sprites include enemies and clouds
     """
 
-    def update(self):
-        """Update the position of the sprite
-        When it moves off screen to the left, remove it
-        """
-        super().update()
+    @property
+    def off_screen(self) -> bool:
+        """True once the sprite has moved off screen to the left"""
+        # Half the width is enough here, self.right would rebuild the hit box
+        # that the last move invalidated.
+        return self.center_x + self.width / 2 < 0
 
-        # Remove if off screen
-        if self.right < 0:
-            self.remove_from_sprite_lists()
+
+def replay_sound(voice: pyglet.media.Player, sound: arcade.Sound):
+    """Play a sound from the start on an existing pyglet player
+
+    Arguments:
+        voice {pyglet.media.Player} -- Player to reuse
+        sound {arcade.Sound} -- Sound the player was created for
+    """
+    # The player drops its source once it reaches the end, so queue it again
+    if voice.source is None:
+        voice.queue(sound.source)
+    else:
+        voice.seek(0)
+    voice.play()
 
 
 class SpaceShooter(arcade.Window):
@@ -46,6 +71,8 @@ class SpaceShooter(arcade.Window):
         super().__init__(width, height, title)
 
         self.paused: bool = False
+        # Time (monotonic seconds) to close the window at, once the game is over
+        self._close_at: float | None = None
         self.scene: arcade.Scene | None = None
 
         # SpriteList come with update/draw/check behaviors.
@@ -53,11 +80,37 @@ class SpaceShooter(arcade.Window):
         self.clouds_list: arcade.SpriteList | None = None
         self.player: arcade.Sprite | None = None
         self.physics_engine: arcade.PhysicsEngineSimple | None = None
+        # Textures are loaded once in setup() and shared by every spawn
+        self.missile_texture: arcade.Texture | None = None
+        self.cloud_textures: List[arcade.Texture] = []
+        # Counts spawn ticks so clouds appear on every fourth one
+        self.spawn_ticks: int = 0
+        # Flyers waiting to be respawned, filled in setup() and by the cull
+        self.enemy_pool: Deque[FlyingSprite] = deque(maxlen=ENEMY_POOL_SIZE)
+        self.cloud_pool: Deque[FlyingSprite] = deque(maxlen=CLOUD_POOL_SIZE)
         self.collision_sound: arcade.Sound | None = None
         self.move_up_sound: arcade.Sound | None = None
         self.move_down_sound: arcade.Sound | None = None
+        # One reusable pyglet player per movement sound, instead of one per key press
+        self.move_up_voice: pyglet.media.Player | None = None
+        self.move_down_voice: pyglet.media.Player | None = None
         self.background_music: arcade.Sound | None = None
         self.debug: bool = False
+
+        # Key press handlers, looked up by symbol instead of an if chain
+        self._press_table: Dict[int, Callable[[], None]] = {
+            arcade.key.ESCAPE: self.quit_game,
+            arcade.key.P: self.toggle_pause,
+            arcade.key.O: self.toggle_debug,
+        }
+        for keys, handler in (
+            (UP_KEYS, self.move_up),
+            (DOWN_KEYS, self.move_down),
+            (LEFT_KEYS, self.move_left),
+            (RIGHT_KEYS, self.move_right),
+        ):
+            self._press_table.update(dict.fromkeys(keys, handler))
+
         self.setup()
 
     # Have a seperate setup() for managing multiple levels & re-init'ing.
@@ -67,6 +120,7 @@ class SpaceShooter(arcade.Window):
         arcade.set_background_color(arcade.color.SKY_BLUE)
 
         self.paused = False
+        self._close_at = None
         self.debug = False
 
         self.scene = arcade.Scene()
@@ -74,24 +128,56 @@ class SpaceShooter(arcade.Window):
         self.player = arcade.Sprite("images/jet.png", SCALING, center_y=self.height / 2)
         self.player.left = 10
 
-        enemies_list: arcade.SpriteList = arcade.SpriteList()
-        clouds_list: arcade.SpriteList = arcade.SpriteList()
-
         self.scene.add_sprite(SpritesEnum.PLAYER, sprite=self.player)
-        self.scene.add_sprite_list(SpritesEnum.ENEMIES, sprite_list=enemies_list)
-        self.scene.add_sprite_list(SpritesEnum.CLOUDS, sprite_list=clouds_list)
-
-        # Spawn new enemy every 0.25s
-        arcade.schedule(self.add_enemy, 0.25)
+        self.scene.add_sprite_list(SpritesEnum.ENEMIES)
+        self.scene.add_sprite_list(SpritesEnum.CLOUDS)
+        # Keep direct references so on_update doesn't look them up every frame.
+        # Take them from the scene, add_sprite_list() replaces an empty list
+        # that is passed in with a new one.
+        self.enemies_list = self.scene[SpritesEnum.ENEMIES]
+        self.clouds_list = self.scene[SpritesEnum.CLOUDS]
+
+        # Load the flyer textures up front, clouds face either way.
+        # Flyers use the plain texture rectangle as hit box, no alpha scan.
+        self.missile_texture = arcade.load_texture(
+            "images/missile.png", hit_box_algorithm="None"
+        )
+        self.cloud_textures = [
+            arcade.load_texture("images/cloud.png", hit_box_algorithm="None"),
+            arcade.load_texture(
+                "images/cloud.png", flipped_horizontally=True, hit_box_algorithm="None"
+            ),
+        ]
+
+        # Build the flyers up front, spawning reuses them instead of allocating
+        self.enemy_pool = deque(
+            (
+                FlyingSprite(texture=self.missile_texture, scale=SCALING)
+                for _ in range(ENEMY_POOL_SIZE)
+            ),
+            maxlen=ENEMY_POOL_SIZE,
+        )
+        self.cloud_pool = deque(
+            (
+                FlyingSprite(texture=self.cloud_textures[0], scale=SCALING)
+                for _ in range(CLOUD_POOL_SIZE)
+            ),
+            maxlen=CLOUD_POOL_SIZE,
+        )
 
-        # Spawn a new cloud every 1s
-        arcade.schedule(self.add_cloud, 1.0)
+        # One spawn tick every 0.25s: a new enemy each tick, a new cloud every 1s
+        self.spawn_ticks = 0
+        arcade.schedule(self.spawn_flyers, 0.25)
 
         # Load your sounds
         # Sound sources: Jon Fincher
         self.collision_sound = arcade.load_sound("sounds/Collision.wav")
         self.move_up_sound = arcade.load_sound("sounds/Rising_putter.wav")
         self.move_down_sound = arcade.load_sound("sounds/Falling_putter.wav")
+        self.move_up_voice = pyglet.media.Player()
+        self.move_up_voice.queue(self.move_up_sound.source)
+        self.move_down_voice = pyglet.media.Player()
+        self.move_down_voice.queue(self.move_down_sound.source)
 
         # Load your background music
         # Sound source: http://ccmixter.org/files/Apoxode/59262
@@ -102,41 +188,53 @@ class SpaceShooter(arcade.Window):
 
     def keep_player_in_bounds(self):
         # Keep the player on screen
-        if self.player.top > self.height:
-            self.player.top = self.height
-        if self.player.right > self.width:
-            self.player.right = self.width
-        if self.player.bottom < 0:
-            self.player.bottom = 0
-        if self.player.left < 0:
-            self.player.left = 0
+        # Only assign when out of bounds, the edge setters re-read the hit box.
+        player = self.player
+        if player.top > self.height:
+            player.top = self.height
+        if player.right > self.width:
+            player.right = self.width
+        if player.bottom < 0:
+            player.bottom = 0
+        if player.left < 0:
+            player.left = 0
 
     def on_update(self, delta_time: float):
         super().on_update(delta_time)
 
+        # Close once the game over delay has passed, without blocking the loop
+        if self._close_at is not None and monotonic() >= self._close_at:
+            arcade.close_window()
+            return
+
         # If paused, don't update anything
         if self.paused:
             return
 
-        # enemies_list: arcade.SpriteList = self.scene.get_sprite_list(
-        #     SpritesEnum.ENEMIES
-        # )
-        # Dictionary method to get sprite list in scene
-        enemies_list: arcade.SpriteList = self.scene[SpritesEnum.ENEMIES]
-
-        # Check for collisions before updates
-        if self.player.collides_with_list(enemies_list):
+        # Check for collisions before updates, once the game is over only
+        # the close delay is left to run out
+        if self._close_at is None and self.player.collides_with_list(self.enemies_list):
             arcade.play_sound(self.collision_sound)
-            sleep(1)
-            arcade.close_window()
+            self._close_at = monotonic() + 1.0
+            self.paused = True
+            return
 
-        for sprite_list in self.scene.sprite_lists:
-            for sprite in sprite_list:
-                sprite.set_position = (
-                    int(sprite.center_x + sprite.change_x * delta_time),
-                    int(sprite.center_y + sprite.change_y * delta_time),
-                )
-                sprite.update()
+        # Step the player, enemies and clouds, one SpriteList.update() per layer
+        self.scene.update()
+
+        # Cull flyers that left the screen in one pass after the update, and
+        # return them to their pool. Removing them during the update skipped
+        # the next sprite in the list.
+        for sprite_list, pool in (
+            (self.enemies_list, self.enemy_pool),
+            (self.clouds_list, self.cloud_pool),
+        ):
+            off_screen: List[FlyingSprite] = [
+                sprite for sprite in sprite_list if sprite.off_screen
+            ]
+            for sprite in off_screen:
+                sprite.remove_from_sprite_lists()
+                pool.append(sprite)
 
         # Keep this after player update.
         self.keep_player_in_bounds()
@@ -151,6 +249,18 @@ class SpaceShooter(arcade.Window):
         if self.debug:
             self.scene.draw_hit_boxes()
 
+    def spawn_flyers(self, delta_time: float):
+        """Spawns an enemy every call and a cloud every fourth call
+
+        Arguments:
+            delta_time {float} -- How much time has passed since the last call
+        """
+        self.add_enemy(delta_time)
+
+        self.spawn_ticks = (self.spawn_ticks + 1) % 4
+        if self.spawn_ticks == 0:
+            self.add_cloud(delta_time)
+
     def add_enemy(self, delta_time: float):
         """Adds a new enemy to the screen
 
@@ -160,18 +270,23 @@ class SpaceShooter(arcade.Window):
         if self.paused:
             return
 
-        # First, create the new enemy sprite
-        enemy: FlyingSprite = FlyingSprite("images/missile.png", SCALING)
+        # First, take an enemy sprite from the pool, or create one if it is empty
+        enemy: FlyingSprite
+        if self.enemy_pool:
+            enemy = self.enemy_pool.pop()
+        else:
+            enemy = FlyingSprite(texture=self.missile_texture, scale=SCALING)
 
         # Set its position to a random height and off screen right
-        enemy.left = random.randint(self.width, self.width + 80)
-        enemy.top = random.randint(10, self.height - 10)
+        # (random.random() arithmetic is cheaper than randint on spawn paths)
+        enemy.left = self.width + int(random.random() * 81)
+        enemy.top = 10 + int(random.random() * (self.height - 19))
 
         # Set its speed to a random speed heading left
-        enemy.velocity = (random.randint(-15, -5), 0)
+        enemy.velocity = (-15 + int(random.random() * 11), 0)
 
         # Add it to the enemies list
-        self.scene.add_sprite(SpritesEnum.ENEMIES, sprite=enemy)
+        self.enemies_list.append(enemy)
 
     def add_cloud(self, delta_time: float):
         """Adds a new cloud to the screen
@@ -182,20 +297,24 @@ class SpaceShooter(arcade.Window):
         if self.paused:
             return
 
-        # First, create the new cloud sprite
-        cloud: FlyingSprite = FlyingSprite(
-            "images/cloud.png", SCALING, flipped_horizontally=random.randint(0, 1)
-        )
+        # First, take a cloud sprite from the pool, or create one if it is empty
+        texture: arcade.Texture = self.cloud_textures[int(random.random() * 2)]
+        cloud: FlyingSprite
+        if self.cloud_pool:
+            cloud = self.cloud_pool.pop()
+            cloud.texture = texture
+        else:
+            cloud = FlyingSprite(texture=texture, scale=SCALING)
 
         # Set its position to a random height and off screen right
-        cloud.left = random.randint(self.width, self.width + 80)
-        cloud.top = random.randint(10, self.height - 10)
+        cloud.left = self.width + int(random.random() * 81)
+        cloud.top = 10 + int(random.random() * (self.height - 19))
 
         # Set its speed to a random speed heading left
-        cloud.velocity = (random.randint(-10, -5), 0)
+        cloud.velocity = (-10 + int(random.random() * 6), 0)
 
         # Add it to the clouds list
-        self.scene.add_sprite(SpritesEnum.CLOUDS, sprite=cloud)
+        self.clouds_list.append(cloud)
 
     def on_key_press(self, symbol, modifiers):
         """Handle user keyboard input
@@ -209,29 +328,41 @@ class SpaceShooter(arcade.Window):
             symbol {int} -- Which key was pressed
             modifiers {int} -- Which modifiers were pressed
         """
-        if symbol == arcade.key.ESCAPE:
-            # Quit immediately
-            arcade.close_window()
+        handler = self._press_table.get(symbol)
+        if handler is not None:
+            handler()
+
+    def quit_game(self):
+        """Quit immediately"""
+        arcade.close_window()
 
-        if symbol == arcade.key.P:
-            self.paused = not self.paused
+    def toggle_pause(self):
+        """Pause or unpause the game, unless it is already over"""
+        if self._close_at is not None:
+            return
+        self.paused = not self.paused
 
-        if symbol == arcade.key.O:
-            self.debug = not self.debug
+    def toggle_debug(self):
+        """Show or hide the sprite hit boxes"""
+        self.debug = not self.debug
 
-        if symbol in [arcade.key.W, arcade.key.UP]:
-            self.player.change_y = 5
-            arcade.play_sound(self.move_up_sound)
+    def move_up(self):
+        """Start moving the player up"""
+        self.player.change_y = 5
+        replay_sound(self.move_up_voice, self.move_up_sound)
 
-        if symbol in [arcade.key.S, arcade.key.DOWN]:
-            self.player.change_y = -5
-            arcade.play_sound(self.move_down_sound)
+    def move_down(self):
+        """Start moving the player down"""
+        self.player.change_y = -5
+        replay_sound(self.move_down_voice, self.move_down_sound)
 
-        if symbol in [arcade.key.A, arcade.key.LEFT]:
-            self.player.change_x = -5
+    def move_left(self):
+        """Start moving the player left"""
+        self.player.change_x = -5
 
-        if symbol in [arcade.key.D, arcade.key.RIGHT]:
-            self.player.change_x = 5
+    def move_right(self):
+        """Start moving the player right"""
+        self.player.change_x = 5
 
     def on_key_release(self, symbol: int, modifiers: int):
         """Undo movement vectors when movement keys are released
@@ -240,9 +371,9 @@ class SpaceShooter(arcade.Window):
             symbol {int} -- Which key was pressed
             modifiers {int} -- Which modifiers were pressed
         """
-        if symbol in [arcade.key.W, arcade.key.S, arcade.key.UP, arcade.key.DOWN]:
+        if symbol in VERTICAL_KEYS:
             self.player.change_y = 0
-        if symbol in [arcade.key.A, arcade.key.D, arcade.key.LEFT, arcade.key.RIGHT]:
+        if symbol in HORIZONTAL_KEYS:
             self.player.change_x = 0
 
 